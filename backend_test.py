@@ -0,0 +1,179 @@
+"""Unit tests for D-Bus backends (no D-Bus connection is made)."""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+import i3blocks_mpris
+from gi.repository import Gio, GLib
+
+
+class TestGioBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = mock.Mock()
+        self.backend = i3blocks_mpris.GioBackend()
+        self.backend._connection = self.connection
+
+    def call_method(self, **kwargs):
+        reply_handler = mock.Mock()
+        error_handler = mock.Mock()
+        self.backend.call_method(
+            bus_name='org.example', object_path='/org/example',
+            interface='org.example.Interface', method='Method',
+            reply_handler=reply_handler, error_handler=error_handler,
+            **kwargs,
+        )
+        args = self.connection.call.call_args.args
+        callback = args[-1]
+        return args, callback, reply_handler, error_handler
+
+    def test_call_method_without_arguments(self):
+        args, _, _, _ = self.call_method()
+
+        self.assertEqual(
+            ('org.example', '/org/example', 'org.example.Interface', 'Method'),
+            args[:4],
+        )
+        self.assertIsNone(args[4])
+
+    def test_call_method_builds_tuple_variant(self):
+        args, _, _, _ = self.call_method(signature='ss', args=['a', 'b'])
+
+        parameters = args[4]
+        self.assertEqual('(ss)', parameters.get_type_string())
+        self.assertEqual(('a', 'b'), parameters.unpack())
+
+    def test_call_method_reply(self):
+        _, callback, reply_handler, error_handler = self.call_method()
+        self.connection.call_finish.return_value = GLib.Variant(
+            '(bs)', (True, 'x'))
+
+        callback(self.connection, 'task')
+
+        self.connection.call_finish.assert_called_once_with('task')
+        reply_handler.assert_called_once_with(True, 'x')
+        error_handler.assert_not_called()
+
+    def test_call_method_error(self):
+        _, callback, reply_handler, error_handler = self.call_method()
+        error = GLib.Error('failed')
+        self.connection.call_finish.side_effect = error
+
+        callback(self.connection, 'task')
+
+        error_handler.assert_called_once_with(error)
+        reply_handler.assert_not_called()
+
+    def test_add_signal_receiver(self):
+        handler = mock.Mock()
+        self.connection.signal_subscribe.return_value = 42
+
+        signal_match = self.backend.add_signal_receiver(
+            handler, bus_name='org.example', interface='org.example.Interface',
+            signal_name='Signal', object_path='/org/example', arg0='arg',
+        )
+
+        args = self.connection.signal_subscribe.call_args.args
+        self.assertEqual(
+            (
+                'org.example', 'org.example.Interface', 'Signal',
+                '/org/example', 'arg', Gio.DBusSignalFlags.NONE,
+            ),
+            args[:6],
+        )
+        callback = args[6]
+        callback(
+            self.connection, ':1.1', '/org/example', 'org.example.Interface',
+            'Signal', GLib.Variant('(sas)', ('one', ['two'])),
+        )
+        handler.assert_called_once_with('one', ['two'])
+
+        signal_match.remove()
+        self.connection.signal_unsubscribe.assert_called_once_with(42)
+
+    def test_add_signal_receiver_without_filters(self):
+        self.backend.add_signal_receiver(
+            mock.Mock(), bus_name='org.example',
+            interface='org.example.Interface', signal_name='Signal',
+        )
+
+        args = self.connection.signal_subscribe.call_args.args
+        self.assertEqual((None, None), args[3:5])
+
+
+class TestDBusPythonBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = mock.Mock()
+        self.backend = i3blocks_mpris.DBusPythonBackend()
+        self.backend._bus = self.bus
+
+    def test_call_method(self):
+        reply_handler = mock.Mock()
+        error_handler = mock.Mock()
+
+        self.backend.call_method(
+            bus_name='org.example', object_path='/org/example',
+            interface='org.example.Interface', method='Method',
+            signature='s', args=('a',),
+            reply_handler=reply_handler, error_handler=error_handler,
+        )
+
+        self.bus.call_async.assert_called_once_with(
+            bus_name='org.example', object_path='/org/example',
+            dbus_interface='org.example.Interface', method='Method',
+            signature='s', args=['a'],
+            reply_handler=reply_handler, error_handler=error_handler,
+        )
+
+    def test_add_signal_receiver_passes_arg0_only_if_set(self):
+        handler = mock.Mock()
+
+        self.backend.add_signal_receiver(
+            handler, bus_name='org.example', interface='org.example.Interface',
+            signal_name='Signal',
+        )
+        self.assertNotIn('arg0', self.bus.add_signal_receiver.call_args.kwargs)
+
+        self.backend.add_signal_receiver(
+            handler, bus_name='org.example', interface='org.example.Interface',
+            signal_name='Signal', object_path='/org/example', arg0='arg',
+        )
+        kwargs = self.bus.add_signal_receiver.call_args.kwargs
+        self.assertEqual('arg', kwargs['arg0'])
+        self.assertEqual('/org/example', kwargs['path'])
+        self.assertIs(handler, kwargs['handler_function'])
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            i3blocks_mpris.MPRISBlocklet('player', config={'backend': 'x'})
+
+    def test_gio_backend_does_not_import_dbus(self):
+        code = '\n'.join([
+            'import sys',
+            'from unittest import mock',
+            'import i3blocks_mpris',
+            "blocklet = i3blocks_mpris.MPRISBlocklet("
+            "'player', config={'backend': 'gio'})",
+            "with mock.patch.object("
+            "i3blocks_mpris.Gio, 'bus_get_sync', create=True):",
+            '    blocklet.init_bus()',
+            "sys.exit('dbus' in sys.modules)",
+        ])
+
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+
+        self.assertEqual(0, result.returncode)
+
+
+if __name__ == '__main__':
+    unittest.main()
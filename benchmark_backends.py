@@ -0,0 +1,209 @@
+"""Compares D-Bus backends: startup time, RSS and per-signal latency.
+
+Requires a D-Bus session bus. Each backend is measured in a fresh
+subprocess so that imported modules do not affect each other's numbers:
+
+    python benchmark_backends.py [--signals N] [--runs N]
+
+In each subprocess, a fake MPRIS player owning a unique well-known name is
+served from a separate thread with its own GLib main context and D-Bus
+connection, and the blocklet is started against that name with `start()`.
+
+Measured values:
+
+  * startup — time to import the module plus `MPRISBlocklet.start()`:
+    the bus connection, the player lookup, and the initial property reads
+  * rss — max resident set size after startup (`resource.getrusage`);
+    it includes the fake player's connection, the same for both backends
+  * per signal — average time from emitting a `PropertiesChanged` signal
+    to the blocklet's `output()` call, one signal at a time; this includes
+    the bus daemon round trip, the same for both backends
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+
+BACKENDS = ['dbus-python', 'gio']
+
+PLAYER_INTROSPECTION_XML = '''
+<node>
+  <interface name="org.mpris.MediaPlayer2.Player">
+    <property name="PlaybackStatus" type="s" access="read"/>
+    <property name="Metadata" type="a{sv}" access="read"/>
+  </interface>
+</node>
+'''
+
+SIGNAL_TIMEOUT = 5
+
+
+class FakePlayer:
+    """An MPRIS player served from its own thread and GLib main context."""
+
+    def __init__(self, bus_name: str):
+        self.bus_name = bus_name
+        self._title = 'Title 0'
+        self._connection = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+
+    def _run(self):
+        from gi.repository import Gio, GLib
+
+        context = GLib.MainContext.new()
+        context.push_thread_default()
+        try:
+            # a private connection, the blocklet must not share it
+            connection = Gio.DBusConnection.new_for_address_sync(
+                Gio.dbus_address_get_for_bus_sync(Gio.BusType.SESSION, None),
+                Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+                | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+                None, None,
+            )
+            node_info = Gio.DBusNodeInfo.new_for_xml(PLAYER_INTROSPECTION_XML)
+            connection.register_object(
+                '/org/mpris/MediaPlayer2', node_info.interfaces[0],
+                None, self._get_property, None,
+            )
+            connection.call_sync(
+                'org.freedesktop.DBus', '/org/freedesktop/DBus',
+                'org.freedesktop.DBus', 'RequestName',
+                # 4 — DBUS_NAME_FLAG_DO_NOT_QUEUE
+                GLib.Variant('(su)', (self.bus_name, 4)),
+                GLib.VariantType.new('(u)'), Gio.DBusCallFlags.NONE, -1, None,
+            )
+        except Exception as exc:
+            self._error = exc
+            self._ready.set()
+            return
+        self._connection = connection
+        self._ready.set()
+        GLib.MainLoop.new(context, False).run()
+
+    def _properties(self) -> dict:
+        from gi.repository import GLib
+
+        return {
+            'PlaybackStatus': GLib.Variant('s', 'Playing'),
+            'Metadata': GLib.Variant('a{sv}', {
+                'xesam:artist': GLib.Variant('as', ['Artist']),
+                'xesam:title': GLib.Variant('s', self._title),
+            }),
+        }
+
+    def _get_property(
+        self, _connection, _sender, _object_path, _interface_name,
+        property_name,
+    ):
+        return self._properties()[property_name]
+
+    def emit_properties_changed(self, title: str):
+        from gi.repository import GLib
+
+        self._title = title
+        self._connection.emit_signal(
+            None, '/org/mpris/MediaPlayer2',
+            'org.freedesktop.DBus.Properties', 'PropertiesChanged',
+            GLib.Variant('(sa{sv}as)', (
+                'org.mpris.MediaPlayer2.Player', self._properties(), [],
+            )),
+        )
+
+
+def _measure(backend_name: str, signal_count: int) -> dict:
+    started_at = time.perf_counter()
+    import i3blocks_mpris
+    startup = time.perf_counter() - started_at
+
+    from gi.repository import GLib
+
+    player = FakePlayer(
+        f'org.mpris.MediaPlayer2.i3blocks_mpris_benchmark_{os.getpid()}')
+    player.start()
+    blocklet = i3blocks_mpris.MPRISBlocklet(
+        player.bus_name, config={'backend': backend_name})
+    blocklet.output = lambda _text: None
+    started_at = time.perf_counter()
+    if not blocklet.start(nowait=True):
+        raise RuntimeError('player is not found')
+    startup += time.perf_counter() - started_at
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    loop = GLib.MainLoop()
+    timed_out = False
+
+    def on_timeout():
+        nonlocal timed_out
+        timed_out = True
+        loop.quit()
+        return GLib.SOURCE_REMOVE
+
+    blocklet.output = lambda _text: loop.quit()
+    total = 0.0
+    for index in range(1, signal_count + 1):
+        timeout_source = GLib.timeout_add_seconds(SIGNAL_TIMEOUT, on_timeout)
+        started_at = time.perf_counter()
+        # a unique title defeats deduplication
+        player.emit_properties_changed(f'Title {index}')
+        loop.run()
+        total += time.perf_counter() - started_at
+        if timed_out:
+            raise RuntimeError(f'signal {index} was not received')
+        GLib.source_remove(timeout_source)
+    return {
+        'startup': startup,
+        'rss': rss,
+        'per_signal': total / signal_count,
+    }
+
+
+def _run_child(backend_name: str, signal_count: int) -> dict:
+    output = subprocess.check_output([
+        sys.executable, os.path.abspath(__file__),
+        '--child', backend_name, '--signals', str(signal_count),
+    ])
+    return json.loads(output)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--signals', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', choices=BACKENDS, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def _main():
+    args = _parse_args()
+    if args.child:
+        print(json.dumps(_measure(args.child, args.signals)))
+        return
+    print(f'{"backend":<12} {"startup, ms":>12} {"rss, KiB":>10} '
+          f'{"per signal, µs":>15}')
+    for backend_name in BACKENDS:
+        results = [
+            _run_child(backend_name, args.signals) for _ in range(args.runs)]
+        startup, rss, per_signal = (
+            statistics.median(result[key] for result in results)
+            for key in ('startup', 'rss', 'per_signal')
+        )
+        print(f'{backend_name:<12} {startup * 1e3:>12.1f} {rss:>10.0f} '
+              f'{per_signal * 1e6:>15.1f}')
+
+
+if __name__ == '__main__':
+    _main()
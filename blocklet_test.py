@@ -0,0 +1,362 @@
+"""Unit tests for blocklets (no D-Bus connection is made)."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import i3blocks_mpris
+
+
+METADATA = {'xesam:artist': ['Artist'], 'xesam:title': 'Title'}
+PLAYER = 'org.mpris.MediaPlayer2.player'
+
+
+class FakeError(Exception):
+    pass
+
+
+class FakeBackend(i3blocks_mpris.Backend):
+    """Replies to calls on the next loop iteration like a real bus would."""
+
+    errors = (FakeError,)
+
+    def __init__(self):
+        self.owners = set()
+        self.properties = {'PlaybackStatus': 'Playing', 'Metadata': METADATA}
+        self.failing_methods = set()
+        # if True, GetAll replies are not sent until `reply_pending()`
+        self.hold_replies = False
+        self.pending_replies = []
+        self.calls = []
+
+    def connect(self):
+        pass
+
+    def connect_async(self, *, reply_handler, error_handler):
+        asyncio.get_running_loop().call_soon(reply_handler)
+
+    def name_has_owner(self, bus_name):
+        return bus_name in self.owners
+
+    def list_names(self):
+        return sorted(self.owners)
+
+    def add_signal_receiver(self, handler, **kwargs):
+        return mock.Mock()
+
+    def call_method(
+        self, *, bus_name, object_path, interface, method, signature='',
+        args=(), reply_handler=None, error_handler=None,
+    ):
+        self.calls.append((bus_name, method, tuple(args)))
+        loop = asyncio.get_running_loop()
+        if method in self.failing_methods:
+            loop.call_soon(error_handler, FakeError(method))
+            return
+        if method == 'NameHasOwner':
+            result = (args[0] in self.owners,)
+        elif method == 'ListNames':
+            result = (sorted(self.owners),)
+        elif method == 'GetAll':
+            result = (dict(self.properties),)
+            if self.hold_replies:
+                self.pending_replies.append((reply_handler, result))
+                return
+        else:
+            result = ()
+        loop.call_soon(reply_handler, *result)
+
+    def get_property(self, *, bus_name, object_path, interface, property_name):
+        return self.properties[property_name]
+
+    def reply_pending(self):
+        self.hold_replies = False
+        for reply_handler, result in self.pending_replies:
+            reply_handler(*result)
+        self.pending_replies = []
+
+
+class FakeAsyncMPRISBlocklet(i3blocks_mpris.AsyncMPRISBlocklet):
+
+    BACKENDS = {'fake': FakeBackend}
+
+
+class TestMPRISBlocklet(unittest.TestCase):
+
+    def render(self, config, **kwargs):
+        blocklet = i3blocks_mpris.MPRISBlocklet('player', config=config)
+        lines = []
+        blocklet.output = lines.append
+        blocklet.show_info(**kwargs)
+        return lines
+
+    def test_string_format_is_used_for_all_statuses(self):
+        config = {'format': '{status}: {title}'}
+
+        for status in ['Playing', 'Paused', 'Stopped']:
+            self.assertEqual(
+                [f'{status}: Title'],
+                self.render(config, status=status, metadata=METADATA),
+            )
+
+    def test_per_status_format(self):
+        config = {
+            'format': {
+                'Playing': 'P {title}',
+                'Paused': 'II {artist}',
+                'default': 'D',
+            },
+        }
+
+        self.assertEqual(
+            ['P Title'], self.render(config, status='Playing', metadata=METADATA))
+        self.assertEqual(
+            ['II Artist'], self.render(config, status='Paused', metadata=METADATA))
+        self.assertEqual(
+            ['D'], self.render(config, status='Stopped', metadata=METADATA))
+
+    def test_per_status_format_falls_back_to_default_config(self):
+        config = {'format': {'Playing': '{title}'}}
+
+        self.assertEqual(
+            ['Stopped: Artist – Title'],
+            self.render(config, status='Stopped', metadata=METADATA),
+        )
+
+    def test_per_status_format_with_conditional_segments(self):
+        config = {
+            'conditional_segments': True,
+            'format': {'Playing': '[{artist} – ]{title}'},
+        }
+
+        self.assertEqual(
+            ['Title'],
+            self.render(
+                config, status='Playing', metadata={'xesam:title': 'Title'}),
+        )
+
+    def test_unknown_format_keys_are_rejected(self):
+        with self.assertRaises(ValueError):
+            i3blocks_mpris.MPRISBlocklet(
+                'player', config={'format': {'paused': '{title}'}})
+
+    def test_non_string_formats_are_rejected(self):
+        for format_config in [['{title}'], None, {'Playing': None}]:
+            with self.assertRaises(ValueError):
+                i3blocks_mpris.MPRISBlocklet(
+                    'player', config={'format': format_config})
+
+
+class TestAsyncMPRISBlocklet(unittest.IsolatedAsyncioTestCase):
+
+    def make_blocklet(self, config=None):
+        blocklet = i3blocks_mpris.AsyncMPRISBlocklet('player', config=config)
+        blocklet._player_connected = True
+        return blocklet
+
+    async def collect_updates(self, blocklet):
+        blocklet.stop()
+        return [update async for update in blocklet.updates()]
+
+    async def test_status_change_is_reported_if_text_is_the_same(self):
+        blocklet = self.make_blocklet({'format': '{artist} – {title}'})
+
+        blocklet.show_info(status='Playing', metadata=METADATA)
+        blocklet.show_info(status='Paused', only_if_changed=True)
+        blocklet.show_info(status='Paused', only_if_changed=True)
+
+        self.assertEqual(
+            [
+                i3blocks_mpris.Update(
+                    'Artist – Title', 'Playing', 'org.mpris.MediaPlayer2.player'),
+                i3blocks_mpris.Update(
+                    'Artist – Title', 'Paused', 'org.mpris.MediaPlayer2.player'),
+            ],
+            await self.collect_updates(blocklet),
+        )
+
+    async def test_stop_ends_all_iterators(self):
+        blocklet = self.make_blocklet()
+
+        blocklet.show_info(status='Playing', metadata=METADATA)
+
+        self.assertEqual(1, len(await self.collect_updates(blocklet)))
+        self.assertEqual([], [update async for update in blocklet.updates()])
+
+    async def test_pick_instance_skips_vanished_current_instance(self):
+        blocklet = self.make_blocklet()
+        blocklet._instances = {
+            'org.mpris.MediaPlayer2.player.instance1': True,
+            'org.mpris.MediaPlayer2.player.instance2': True,
+        }
+        blocklet._bus_name = 'org.mpris.MediaPlayer2.player.instance2'
+
+        self.assertEqual(
+            'org.mpris.MediaPlayer2.player.instance1',
+            blocklet._pick_instance(),
+        )
+        blocklet._bus_name = 'org.mpris.MediaPlayer2.player.instance1'
+        self.assertIsNone(blocklet._pick_instance())
+
+
+
+class TestAsyncMPRISBlockletConnection(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        # any loop passes the GLib event loop check
+        patcher = mock.patch('gi.events.GLibEventLoop', asyncio.AbstractEventLoop)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_blocklet(self, owners=(), **config):
+        blocklet = FakeAsyncMPRISBlocklet(
+            'player', config={'backend': 'fake', **config})
+        blocklet._backend.owners.update(owners)
+        return blocklet
+
+    async def collect_updates(self, blocklet):
+        blocklet.stop()
+        return [update async for update in blocklet.updates()]
+
+    async def wait_for_pending_replies(self, backend):
+        while not backend.pending_replies:
+            await asyncio.sleep(0)
+
+    async def test_non_glib_loop_is_rejected(self):
+        blocklet = self.make_blocklet()
+
+        with mock.patch('gi.events.GLibEventLoop', type('Loop', (), {})):
+            with self.assertRaises(RuntimeError):
+                await blocklet.connect()
+
+    async def test_connect_exact_name(self):
+        blocklet = self.make_blocklet([PLAYER])
+
+        self.assertTrue(await blocklet.connect())
+
+        self.assertEqual(
+            [i3blocks_mpris.Update(
+                'Playing: Artist – Title', 'Playing', PLAYER)],
+            await self.collect_updates(blocklet),
+        )
+        self.assertNotIn(
+            'ListNames', [call[1] for call in blocklet._backend.calls])
+
+    async def test_connect_name_prefix_picks_last_instance(self):
+        blocklet = self.make_blocklet([
+            f'{PLAYER}.instance1', f'{PLAYER}.instance2',
+            'org.mpris.MediaPlayer2.other',
+        ])
+
+        self.assertTrue(await blocklet.connect())
+
+        self.assertEqual(
+            [i3blocks_mpris.Update(
+                'Playing: Artist – Title', 'Playing', f'{PLAYER}.instance2')],
+            await self.collect_updates(blocklet),
+        )
+
+    async def test_connect_without_player_shows_placeholder(self):
+        blocklet = self.make_blocklet(placeholder='no player')
+
+        self.assertTrue(await blocklet.connect())
+
+        self.assertEqual(
+            [i3blocks_mpris.Update('no player', None, None)],
+            await self.collect_updates(blocklet),
+        )
+
+    async def test_connect_nowait_without_player(self):
+        blocklet = self.make_blocklet(placeholder='no player')
+
+        self.assertFalse(await blocklet.connect(nowait=True))
+
+        self.assertEqual([], await self.collect_updates(blocklet))
+
+    async def test_connect_survives_player_restart_during_initial_info(self):
+        blocklet = self.make_blocklet([PLAYER])
+        backend = blocklet._backend
+        backend.hold_replies = True
+        connect_task = asyncio.create_task(blocklet.connect())
+        await self.wait_for_pending_replies(backend)
+
+        blocklet._on_specific_name_owner_changed(PLAYER, ':1.1', '')
+        backend.properties['PlaybackStatus'] = 'Paused'
+        backend.reply_pending()
+        blocklet._on_specific_name_owner_changed(PLAYER, '', ':1.2')
+
+        self.assertTrue(await connect_task)
+        self.assertEqual(
+            [
+                i3blocks_mpris.Update('', None, None),
+                i3blocks_mpris.Update(
+                    'Paused: Artist – Title', 'Paused', PLAYER),
+            ],
+            await self.collect_updates(blocklet),
+        )
+
+    async def test_connect_survives_stop_during_initial_info(self):
+        blocklet = self.make_blocklet([PLAYER])
+        blocklet._backend.hold_replies = True
+        connect_task = asyncio.create_task(blocklet.connect())
+        await self.wait_for_pending_replies(blocklet._backend)
+
+        blocklet.stop()
+
+        self.assertTrue(await connect_task)
+        self.assertEqual([], [update async for update in blocklet.updates()])
+
+    async def test_connect_after_stop_is_rejected(self):
+        blocklet = self.make_blocklet([PLAYER])
+        await blocklet.connect()
+        blocklet.stop()
+
+        with self.assertRaises(RuntimeError):
+            await blocklet.connect()
+
+    async def test_initial_info_error_is_ignored(self):
+        blocklet = self.make_blocklet([PLAYER])
+        blocklet._backend.failing_methods.add('GetAll')
+
+        self.assertTrue(await blocklet.connect())
+
+        self.assertEqual([], await self.collect_updates(blocklet))
+
+    async def test_call(self):
+        blocklet = self.make_blocklet([PLAYER])
+        await blocklet.connect()
+
+        await blocklet.call('Next')
+
+        self.assertEqual((PLAYER, 'Next', ()), blocklet._backend.calls[-1])
+
+    async def test_call_error(self):
+        blocklet = self.make_blocklet([PLAYER])
+        blocklet._backend.failing_methods.add('Next')
+        await blocklet.connect()
+
+        with self.assertRaises(FakeError):
+            await blocklet.call('Next')
+
+    async def test_call_without_player(self):
+        blocklet = self.make_blocklet()
+        await blocklet.connect()
+
+        with self.assertRaises(RuntimeError):
+            await blocklet.call('Next')
+
+    async def test_click(self):
+        blocklet = self.make_blocklet([PLAYER], mouse_buttons={'3': 'Next'})
+        await blocklet.connect()
+
+        await blocklet.click('1')
+        await blocklet.click('3')
+        await blocklet.click('5')
+
+        self.assertEqual(
+            [(PLAYER, 'PlayPause', ()), (PLAYER, 'Next', ())],
+            blocklet._backend.calls[-2:],
+        )
+
+if __name__ == '__main__':
+    unittest.main()
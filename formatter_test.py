@@ -1,6 +1,7 @@
 """Unit tests for string formatter."""
 
 import unittest
+from unittest import mock
 
 import i3blocks_mpris
 
@@ -224,5 +225,88 @@ class TestFormatter(unittest.TestCase):
             ),
         )
 
+    def test_compiled_template_renders_as_format(self):
+        formatter = i3blocks_mpris.Formatter(status_icons={'Playing': 'P'})
+        format_string = '{status:icon} {{{artist:.3,…}}} - {title:>{width}}'
+        kwargs = {
+            'status': 'Playing', 'artist': 'abcdef', 'title': 'x', 'width': 3,
+        }
+
+        template = formatter.compile(format_string)
+
+        self.assertEqual(
+            formatter.format(format_string, **kwargs),
+            formatter.render(template, **kwargs),
+        )
+        self.assertEqual('P {abc…} -   x', formatter.render(template, **kwargs))
+
+    def test_brackets_are_literal_if_conditional_segments_are_off(self):
+        formatter = i3blocks_mpris.Formatter()
+        template = formatter.compile('[{status}] [[{title}]]')
+
+        self.assertEqual(
+            '[Playing] [[T]]',
+            formatter.render(template, status='Playing', title='T'),
+        )
+
+    def test_compiled_template_does_not_resolve_format_specs_on_render(self):
+        formatter = i3blocks_mpris.Formatter(status_icons={'Playing': 'P'})
+        template = formatter.compile('{status:icon} {artist:upper} {title:.3,…}')
+
+        with mock.patch.object(
+            formatter, '_resolve_format_funcs', side_effect=AssertionError,
+        ):
+            self.assertEqual(
+                'P ARTIST abc…',
+                formatter.render(
+                    template, status='Playing', artist='Artist', title='abcdef'),
+            )
+
+    def test_conditional_segment_is_shown_if_fields_are_non_empty(self):
+        formatter = i3blocks_mpris.Formatter(conditional_segments=True)
+        template = formatter.compile('[{artist} – ]{title}')
+
+        self.assertEqual(
+            'Artist – Title',
+            formatter.render(template, artist='Artist', title='Title'),
+        )
+
+    def test_conditional_segment_is_hidden_if_any_field_is_empty(self):
+        formatter = i3blocks_mpris.Formatter(conditional_segments=True)
+        template = formatter.compile('[{artist} – ]{title}[ ({album}, {year})]')
+
+        self.assertEqual(
+            'Title',
+            formatter.render(
+                template, artist='', title='Title', album='Album', year=None),
+        )
+
+    def test_conditional_segment_checks_sanitized_values(self):
+        formatter = i3blocks_mpris.Formatter(conditional_segments=True)
+        template = formatter.compile('[{artist} – ]{title}')
+
+        self.assertEqual(
+            'Title', formatter.render(template, artist='\x01', title='Title'))
+
+    def test_conditional_segment_escaped_brackets(self):
+        formatter = i3blocks_mpris.Formatter(conditional_segments=True)
+        template = formatter.compile('[[{status}]][ [[{artist}]]]')
+
+        self.assertEqual(
+            '[Playing] [Artist]',
+            formatter.render(template, status='Playing', artist='Artist'),
+        )
+        self.assertEqual(
+            '[Playing]',
+            formatter.render(template, status='Playing', artist=''),
+        )
+
+    def test_conditional_segment_unmatched_brackets(self):
+        formatter = i3blocks_mpris.Formatter(conditional_segments=True)
+
+        for format_string in ['[{artist}', '{artist}]', '[[{artist}]', '[[]]]']:
+            with self.assertRaises(ValueError):
+                formatter.compile(format_string)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,6 @@
+import abc
 import argparse
+import asyncio
 import enum
 import html
 import json
@@ -7,10 +9,10 @@ import re
 import string
 import sys
 import unicodedata
+from collections.abc import AsyncIterator
 from copy import deepcopy
+from typing import NamedTuple
 
-import dbus
-from dbus.mainloop.glib import DBusGMainLoop, threads_init
 from gi.repository import Gio, GioUnix, GLib
 
 
@@ -24,6 +26,23 @@ class MatchMode(enum.Enum):
     PREFIX = 2
 
 
+class _Field(NamedTuple):
+    name: str
+    conversion: str | None
+    # a plain string or a compiled template if there are nested fields
+    format_spec: 'str | tuple'
+    # resolved at compile time for plain string format specs only,
+    # see `Formatter._resolve_format_funcs()`
+    format_func: object = None
+    truncate_func: object = None
+
+
+class _Segment(NamedTuple):
+    parts: tuple
+    # the segment is rendered only if all these fields are non-empty
+    field_names: tuple[str, ...]
+
+
 class Formatter(string.Formatter):
 
     _FORMAT_FUNCS = {
@@ -58,20 +77,36 @@ class Formatter(string.Formatter):
     def __init__(
         self, status_icons: dict[str, str] | None = None,
         markup_escape: bool = False, sanitize_unicode: bool = True,
+        conditional_segments: bool = False,
     ):
         self._status_icons = status_icons.copy() if status_icons else dict()
         self._markup_escape = markup_escape
         self._sanitize_unicode = sanitize_unicode
+        self._conditional_segments = conditional_segments
 
     def format_field(self, value, format_spec: str):
+        return self._format_value(
+            value, format_spec, *self._resolve_format_funcs(format_spec))
+
+    def _resolve_format_funcs(self, format_spec: str):
+        """Returns a filter function and a truncate-with-suffix function
+        (applied to strings only) for the format spec, either may be None.
+        """
+        format_func = self._FORMAT_FUNCS.get(format_spec)
+        if isinstance(format_func, str):
+            format_func = getattr(self, '_format_func__' + format_func)
+        truncate_func = None
+        if not format_func:
+            truncate_func = self.truncate_with_suffix_func_generator(
+                format_spec)
+        return format_func, truncate_func
+
+    def _format_value(self, value, format_spec, format_func, truncate_func):
         if self._sanitize_unicode and isinstance(value, str):
             value = self._do_sanitize_unicode(value)
-        format_func = self._FORMAT_FUNCS.get(format_spec)
         if not format_func and isinstance(value, str):
-            format_func = self.truncate_with_suffix_func_generator(format_spec)
+            format_func = truncate_func
         if format_func:
-            if isinstance(format_func, str):
-                format_func = getattr(self, '_format_func__' + format_func)
             value = format_func(value)
         else:
             value = super().format_field(value, format_spec)
@@ -79,6 +114,117 @@ class Formatter(string.Formatter):
             value = html.escape(value)
         return value
 
+    def compile(self, format_string: str) -> tuple:
+        """Parses the format string into a template for `render()`.
+
+        If `conditional_segments` is enabled, text enclosed in square
+        brackets is rendered only if all fields in it are non-empty,
+        literal brackets are written as `[[` and `]]`.
+        """
+        if not self._conditional_segments:
+            return self._compile_chunk(format_string)
+        parts = []
+        for chunk, conditional in self._split_segments(format_string):
+            chunk_parts = self._compile_chunk(chunk)
+            if conditional:
+                field_names = tuple(
+                    part.name for part in chunk_parts
+                    if isinstance(part, _Field)
+                )
+                parts.append(_Segment(chunk_parts, field_names))
+            else:
+                parts.extend(chunk_parts)
+        return tuple(parts)
+
+    def render(self, template: tuple, /, **kwargs) -> str:
+        return ''.join(self._render_parts(template, kwargs))
+
+    def _split_segments(self, format_string: str):
+        """Yields `(chunk, conditional)` pairs, unescapes `[[` and `]]`."""
+        chunk = []
+        conditional = False
+        depth = 0
+        index = 0
+        length = len(format_string)
+        while index < length:
+            char = format_string[index]
+            next_char = format_string[index+1:index+2]
+            if char in '{}':
+                if depth == 0 and next_char == char:
+                    chunk.append(char * 2)
+                    index += 2
+                    continue
+                depth += 1 if char == '{' else -1
+            elif depth == 0 and char in '[]':
+                if next_char == char:
+                    chunk.append(char)
+                    index += 2
+                    continue
+                if char == '[' and not conditional:
+                    yield ''.join(chunk), False
+                    chunk = []
+                    conditional = True
+                elif char == ']' and conditional:
+                    yield ''.join(chunk), True
+                    chunk = []
+                    conditional = False
+                else:
+                    raise ValueError(
+                        f"Single '{char}' encountered in format string")
+                index += 1
+                continue
+            chunk.append(char)
+            index += 1
+        if conditional:
+            raise ValueError("Single '[' encountered in format string")
+        yield ''.join(chunk), False
+
+    def _compile_chunk(self, format_string: str) -> tuple:
+        parts = []
+        for literal_text, field_name, format_spec, conversion in (
+            self.parse(format_string)
+        ):
+            if literal_text:
+                parts.append(literal_text)
+            if field_name is None:
+                continue
+            if '{' in format_spec:
+                parts.append(_Field(
+                    field_name, conversion, self._compile_chunk(format_spec)))
+            else:
+                parts.append(_Field(
+                    field_name, conversion, format_spec,
+                    *self._resolve_format_funcs(format_spec),
+                ))
+        return tuple(parts)
+
+    def _render_parts(self, parts: tuple, kwargs: dict):
+        for part in parts:
+            if isinstance(part, str):
+                yield part
+            elif isinstance(part, _Field):
+                value, _ = self.get_field(part.name, (), kwargs)
+                value = self.convert_field(value, part.conversion)
+                format_spec = part.format_spec
+                if isinstance(format_spec, str):
+                    yield self._format_value(
+                        value, format_spec,
+                        part.format_func, part.truncate_func,
+                    )
+                else:
+                    format_spec = ''.join(
+                        self._render_parts(format_spec, kwargs))
+                    yield self.format_field(value, format_spec)
+            else:
+                for field_name in part.field_names:
+                    value, _ = self.get_field(field_name, (), kwargs)
+                    if self._sanitize_unicode and isinstance(value, str):
+                        value = self._do_sanitize_unicode(value)
+                    if value is None or value == '':
+                        break
+                else:
+                    yield from self._render_parts(part.parts, kwargs)
+
     def _do_sanitize_unicode(self, value: str) -> str:
         """Removes all characters belonging to the `C` (“other”) categories
         save for the `Cf` (“format”) category.
@@ -92,12 +238,249 @@ class Formatter(string.Formatter):
         return self._status_icons.get(status, '?')
 
 
+class Backend(abc.ABC):
+    """A D-Bus session bus connection used by the blocklet.
+
+    Signal handlers are called with unpacked signal arguments, method and
+    property values are plain Python (or compatible) objects.
+    """
+
+    DBUS_BUS_NAME = 'org.freedesktop.DBus'
+    DBUS_OBJECT_PATH = '/org/freedesktop/DBus'
+    DBUS_ROOT_INTERFACE = 'org.freedesktop.DBus'
+    DBUS_PROPERTIES_INTERFACE = 'org.freedesktop.DBus.Properties'
+
+    # exception types passed to error handlers
+    errors: tuple[type[Exception], ...] = ()
+
+    @abc.abstractmethod
+    def connect(self) -> None:
+        ...
+
+    @abc.abstractmethod
+    def connect_async(self, *, reply_handler, error_handler) -> None:
+        """Connects to the bus, then calls one of the handlers."""
+
+    @abc.abstractmethod
+    def name_has_owner(self, bus_name: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def list_names(self) -> list[str]:
+        ...
+
+    @abc.abstractmethod
+    def add_signal_receiver(
+        self, handler, *, bus_name: str, interface: str, signal_name: str,
+        object_path: str | None = None, arg0: str | None = None,
+    ):
+        """Returns a signal match object with the `remove()` method."""
+
+    @abc.abstractmethod
+    def call_method(
+        self, *, bus_name: str, object_path: str, interface: str,
+        method: str, signature: str = '', args: tuple = (),
+        reply_handler=None, error_handler=None,
+    ) -> None:
+        """Calls the method asynchronously.
+
+        `reply_handler` is called with unpacked return values, `error_handler`
+        is called with an exception.
+        """
+
+    @abc.abstractmethod
+    def get_property(
+        self, *, bus_name: str, object_path: str, interface: str,
+        property_name: str,
+    ):
+        ...
+
+
+class DBusPythonBackend(Backend):
+    """The dbus-python backend."""
+
+    _bus = None
+
+    def connect(self) -> None:
+        # imported here to avoid loading the second D-Bus stack
+        # when the Gio backend is used
+        import dbus
+        from dbus.mainloop.glib import DBusGMainLoop, threads_init
+
+        # See: https://dbus.freedesktop.org/doc/dbus-python/
+        # dbus.mainloop.html?highlight=thread#dbus.mainloop.glib.threads_init
+        threads_init()
+        DBusGMainLoop(set_as_default=True)
+        self._bus = dbus.SessionBus()
+        self.errors = (dbus.exceptions.DBusException,)
+
+    def connect_async(self, *, reply_handler, error_handler) -> None:
+        # dbus-python has no asynchronous connection API, so this blocks
+        # until the `Hello` round trip is done
+        self.connect()
+        reply_handler()
+
+    def name_has_owner(self, bus_name: str) -> bool:
+        return self._bus.name_has_owner(bus_name)
+
+    def list_names(self) -> list[str]:
+        return self._bus.list_names()
+
+    def add_signal_receiver(
+        self, handler, *, bus_name: str, interface: str, signal_name: str,
+        object_path: str | None = None, arg0: str | None = None,
+    ):
+        kwargs = {}
+        if arg0 is not None:
+            kwargs['arg0'] = arg0
+        return self._bus.add_signal_receiver(
+            bus_name=bus_name,
+            path=object_path,
+            dbus_interface=interface,
+            signal_name=signal_name,
+            handler_function=handler,
+            **kwargs,
+        )
+
+    def call_method(
+        self, *, bus_name: str, object_path: str, interface: str,
+        method: str, signature: str = '', args: tuple = (),
+        reply_handler=None, error_handler=None,
+    ) -> None:
+        self._bus.call_async(
+            bus_name=bus_name,
+            object_path=object_path,
+            dbus_interface=interface,
+            method=method, signature=signature, args=list(args),
+            reply_handler=reply_handler, error_handler=error_handler,
+        )
+
+    def get_property(
+        self, *, bus_name: str, object_path: str, interface: str,
+        property_name: str,
+    ):
+        return self._bus.call_blocking(
+            bus_name=bus_name,
+            object_path=object_path,
+            dbus_interface=self.DBUS_PROPERTIES_INTERFACE,
+            method='Get', signature='ss',
+            args=[interface, property_name],
+        )
+
+
+class _GioSignalMatch:
+
+    def __init__(self, connection: Gio.DBusConnection, subscription_id: int):
+        self._connection = connection
+        self._subscription_id = subscription_id
+
+    def remove(self) -> None:
+        self._connection.signal_unsubscribe(self._subscription_id)
+
+
+class GioBackend(Backend):
+    """The GDBus backend, uses the same GLib main context as stdin reads."""
+
+    _connection: Gio.DBusConnection | None = None
+    errors = (GLib.Error,)
+
+    def connect(self) -> None:
+        self._connection = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+
+    def connect_async(self, *, reply_handler, error_handler) -> None:
+        def callback(_source, task):
+            try:
+                self._connection = Gio.bus_get_finish(task)
+            except GLib.Error as exc:
+                error_handler(exc)
+                return
+            reply_handler()
+
+        Gio.bus_get(Gio.BusType.SESSION, None, callback)
+
+    def _call_sync(
+        self, bus_name: str, object_path: str, interface: str, method: str,
+        parameters: GLib.Variant | None, reply_type: str,
+    ) -> tuple:
+        return self._connection.call_sync(
+            bus_name, object_path, interface, method, parameters,
+            GLib.VariantType.new(reply_type), Gio.DBusCallFlags.NONE,
+            -1, None,
+        ).unpack()
+
+    def name_has_owner(self, bus_name: str) -> bool:
+        return self._call_sync(
+            self.DBUS_BUS_NAME, self.DBUS_OBJECT_PATH,
+            self.DBUS_ROOT_INTERFACE, 'NameHasOwner',
+            GLib.Variant('(s)', (bus_name,)), '(b)',
+        )[0]
+
+    def list_names(self) -> list[str]:
+        return self._call_sync(
+            self.DBUS_BUS_NAME, self.DBUS_OBJECT_PATH,
+            self.DBUS_ROOT_INTERFACE, 'ListNames', None, '(as)',
+        )[0]
+
+    def add_signal_receiver(
+        self, handler, *, bus_name: str, interface: str, signal_name: str,
+        object_path: str | None = None, arg0: str | None = None,
+    ):
+        def callback(
+            _connection, _sender_name, _object_path, _interface_name,
+            _signal_name, parameters,
+        ):
+            handler(*parameters.unpack())
+
+        subscription_id = self._connection.signal_subscribe(
+            bus_name, interface, signal_name, object_path, arg0,
+            Gio.DBusSignalFlags.NONE, callback,
+        )
+        return _GioSignalMatch(self._connection, subscription_id)
+
+    def call_method(
+        self, *, bus_name: str, object_path: str, interface: str,
+        method: str, signature: str = '', args: tuple = (),
+        reply_handler=None, error_handler=None,
+    ) -> None:
+        parameters = None
+        if signature:
+            parameters = GLib.Variant(f'({signature})', tuple(args))
+
+        def callback(connection, task):
+            try:
+                result = connection.call_finish(task)
+            except GLib.Error as exc:
+                if error_handler:
+                    error_handler(exc)
+                return
+            if reply_handler:
+                reply_handler(*result.unpack())
+
+        self._connection.call(
+            bus_name, object_path, interface, method, parameters, None,
+            Gio.DBusCallFlags.NONE, -1, None, callback,
+        )
+
+    def get_property(
+        self, *, bus_name: str, object_path: str, interface: str,
+        property_name: str,
+    ):
+        return self._call_sync(
+            bus_name, object_path, self.DBUS_PROPERTIES_INTERFACE, 'Get',
+            GLib.Variant('(ss)', (interface, property_name)), '(v)',
+        )[0]
+
+
 class MPRISBlocklet:
 
     DEFAULT_CONFIG = {
         # Format: {field} or {field:filter}
         # Fields: status, artist, title
         # Filters: icon (from status only), upper, lower, capitalize, title
+        # Conditional segments: [...], shown if all fields in it are non-empty,
+        # see `conditional_segments`
+        # Either a string or a `PlaybackStatus` to format mapping with
+        # an optional `default` key
         'format': '{status}: {artist} – {title}',
         # A message displayed when there is no player
         'placeholder': '',
@@ -105,6 +488,9 @@ class MPRISBlocklet:
         'markup_escape': False,
         # Remove `C` category unicode characters (except for `Cf`)
         'sanitize_unicode': True,
+        # Treat `[...]` in `format` as conditional segments, `[[`/`]]` as
+        # literal brackets
+        'conditional_segments': False,
         # MPRIS `PlaybackStatus` property to icon mapping
         'status_icons': {
             'Playing': '\uf04b',   # 
@@ -117,20 +503,29 @@ class MPRISBlocklet:
         },
         # Do not print the same info multiple times if True
         'dedupe': True,
+        # D-Bus library: `dbus-python` or `gio`
+        'backend': 'dbus-python',
+    }
+
+    # MPRIS `PlaybackStatus` values and a fallback key
+    FORMAT_KEYS = frozenset({'Playing', 'Paused', 'Stopped', 'default'})
+
+    BACKENDS = {
+        'dbus-python': DBusPythonBackend,
+        'gio': GioBackend,
     }
 
     MPRIS_BUS_NAME_PREFIX = 'org.mpris.MediaPlayer2.'
     MPRIS_OBJECT_PATH = '/org/mpris/MediaPlayer2'
     MPRIS_PLAYER_INTERFACE = 'org.mpris.MediaPlayer2.Player'
 
-    DBUS_BUS_NAME = 'org.freedesktop.DBus'
-    DBUS_OBJECT_PATH = '/org/freedesktop/DBus'
-    DBUS_ROOT_INTERFACE = 'org.freedesktop.DBus'
-    DBUS_PROPERTIES_INTERFACE = 'org.freedesktop.DBus.Properties'
+    DBUS_BUS_NAME = Backend.DBUS_BUS_NAME
+    DBUS_OBJECT_PATH = Backend.DBUS_OBJECT_PATH
+    DBUS_ROOT_INTERFACE = Backend.DBUS_ROOT_INTERFACE
+    DBUS_PROPERTIES_INTERFACE = Backend.DBUS_PROPERTIES_INTERFACE
 
     _loop = None
     _stdin_stream = None
-    _bus: dbus.SessionBus | None = None
     _properties_changed_signal_match = None
     _specific_name_owner_changed_signal_match = None
     _any_name_owner_changed_signal_match = None
@@ -153,7 +548,9 @@ class MPRISBlocklet:
         _config = deepcopy(self.DEFAULT_CONFIG)
         if config:
             for key, value in config.items():
-                if isinstance(value, dict):
+                if isinstance(value, dict) and isinstance(
+                    _config.get(key), dict,
+                ):
                     _config[key].update(value)
                 else:
                     _config[key] = value
@@ -161,11 +558,18 @@ class MPRISBlocklet:
             status_icons=_config['status_icons'],
             markup_escape=_config['markup_escape'],
             sanitize_unicode=_config['sanitize_unicode'],
+            conditional_segments=_config['conditional_segments'],
         )
-        self._format_string = _config['format']
+        self._templates = self._compile_templates(_config['format'])
         self._placeholder = _config['placeholder']
         self._mouse_buttons = _config['mouse_buttons']
         self._dedupe = _config['dedupe']
+        backend_name = _config['backend']
+        try:
+            backend_cls = self.BACKENDS[backend_name]
+        except KeyError:
+            raise ValueError(f'unknown backend: {backend_name}') from None
+        self._backend: Backend = backend_cls()
         self._last_info = None
         self._last_status = None
         self._last_metadata = None
@@ -173,20 +577,41 @@ class MPRISBlocklet:
         # instance suffixes, values — True
         self._instances = {}
 
+    def _compile_templates(self, format_config) -> dict[str, tuple]:
+        if isinstance(format_config, str):
+            format_config = {'default': format_config}
+        elif not isinstance(format_config, dict):
+            raise ValueError(
+                'format must be a string or an object, '
+                f'got {type(format_config).__name__}'
+            )
+        else:
+            for status, format_string in format_config.items():
+                if not isinstance(format_string, str):
+                    raise ValueError(
+                        f'format for {status} must be a string, '
+                        f'got {type(format_string).__name__}'
+                    )
+            unknown_keys = format_config.keys() - self.FORMAT_KEYS
+            if unknown_keys:
+                raise ValueError(
+                    f'unknown format keys: {", ".join(sorted(unknown_keys))}')
+            format_config = {
+                'default': self.DEFAULT_CONFIG['format'], **format_config}
+        return {
+            status: self._formatter.compile(format_string)
+            for status, format_string in format_config.items()
+        }
+
     @classmethod
     def create_loop(cls):
-        loop = GLib.MainLoop()
-        # See: https://dbus.freedesktop.org/doc/dbus-python/
-        # dbus.mainloop.html?highlight=thread#dbus.mainloop.glib.threads_init
-        threads_init()
-        DBusGMainLoop(set_as_default=True)
-        return loop
+        return GLib.MainLoop()
 
     def bus_name_has_owner(self, bus_name: str):
-        return self._bus.name_has_owner(bus_name)
+        return self._backend.name_has_owner(bus_name)
 
     def init_bus(self):
-        self._bus = dbus.SessionBus()
+        self._backend.connect()
 
     def _connect_to_player(self):
         self._player_connected = True
@@ -207,26 +632,42 @@ class MPRISBlocklet:
             self._loop = self.create_loop()
         else:
             self._loop = loop
+        if not self.start(nowait=nowait):
+            return
+        if read_stdin:
+            self.start_stdin_read_loop()
+        try:
+            self._loop.run()
+        finally:
+            self.stop_stdin_read_loop()
+
+    def start(self, *, nowait=False) -> bool:
+        """Connects to the bus and subscribes to the player signals.
+
+        The main loop is not run. Returns False if no player is found and
+        `nowait` is True, True otherwise.
+        """
         self.init_bus()
         # initially, we don't know which match mode to use
         match_mode = MatchMode.UNKNOWN
-        player_found = False
         if self.bus_name_has_owner(self._bus_name):
             # either the player don't allow multiple instance, e.g.,
             # `org.mpris.MediaPlayer2.spotify`, or the user specified the
             # exact instance, e.g., `org.mpris.MediaPlayer2.chromium.instance2`
             # in both cases, the exact name match is used
             match_mode = MatchMode.EXACT
-            player_found = True
         else:
             self._find_instances()
             instance_bus_name = self._pick_instance()
             if instance_bus_name:
-                player_found = True
                 match_mode = MatchMode.PREFIX
                 self._bus_name = instance_bus_name
+        return self._subscribe(match_mode, nowait=nowait)
+
+    def _subscribe(self, match_mode: MatchMode, *, nowait: bool) -> bool:
+        player_found = match_mode != MatchMode.UNKNOWN
         if not player_found and nowait:
-            return
+            return False
         self._match_mode = match_mode
         if player_found:
             self._connect_to_player()
@@ -234,15 +675,17 @@ class MPRISBlocklet:
             self.show_placeholder(only_if_not_empty=True)
         if match_mode != MatchMode.EXACT:
             self._connect_to_any_name_owner_changed_signal()
-        if read_stdin:
-            self.start_stdin_read_loop()
-        try:
-            self._loop.run()
-        finally:
-            self.stop_stdin_read_loop()
+        return True
+
+    def stop(self):
+        """Unsubscribes from all signals subscribed by `start()`."""
+        self._player_connected = False
+        self._disconnect_from_properties_changed_signal()
+        self._disconnect_from_specific_name_owner_changed_signal()
+        self._disconnect_from_any_name_owner_changed_signal()
 
     def _find_instances(self) -> None:
-        for name in self._bus.list_names():
+        for name in self._backend.list_names():
             self._maybe_add_instance(name)
 
     def _maybe_add_instance(self, name: str) -> bool:
@@ -299,27 +742,38 @@ class MPRISBlocklet:
             button = result[0].decode()
         except ValueError:
             button = None
-        if button and self._player_connected:
-            method_name = self._mouse_buttons.get(button)
-            if method_name:
-                self._bus.call_async(
-                    bus_name=self._bus_name,
-                    object_path=self.MPRIS_OBJECT_PATH,
-                    dbus_interface=self.MPRIS_PLAYER_INTERFACE,
-                    method=method_name, signature='', args=[],
-                    reply_handler=None, error_handler=None,
-                )
+        if button:
+            self.handle_button(button)
         self._read_stdin_once()
 
+    def handle_button(self, button: str):
+        if not self._player_connected:
+            return
+        method_name = self._mouse_buttons.get(button)
+        if method_name:
+            self.call_player_method(method_name)
+
+    def call_player_method(
+        self, method_name: str, *, reply_handler=None, error_handler=None,
+    ):
+        self._backend.call_method(
+            bus_name=self._bus_name,
+            object_path=self.MPRIS_OBJECT_PATH,
+            interface=self.MPRIS_PLAYER_INTERFACE,
+            method=method_name,
+            reply_handler=reply_handler, error_handler=error_handler,
+        )
+
     def _connect_to_properties_changed_signal(self):
         if self._properties_changed_signal_match:
             return
-        self._properties_changed_signal_match = self._bus.add_signal_receiver(
+        signal_match = self._backend.add_signal_receiver(
+            self._on_properties_changed,
             bus_name=self._bus_name,
-            dbus_interface=self.DBUS_PROPERTIES_INTERFACE,
+            interface=self.DBUS_PROPERTIES_INTERFACE,
             signal_name='PropertiesChanged',
-            handler_function=self._on_properties_changed,
         )
+        self._properties_changed_signal_match = signal_match
 
     def _on_properties_changed(self, interface_name, changed_properties, _):
         self.show_info(
@@ -336,13 +790,13 @@ class MPRISBlocklet:
     def _connect_to_specific_name_owner_changed_signal(self):
         if self._specific_name_owner_changed_signal_match:
             return
-        signal_match = self._bus.add_signal_receiver(
+        signal_match = self._backend.add_signal_receiver(
+            self._on_specific_name_owner_changed,
             bus_name=self.DBUS_BUS_NAME,
-            path=self.DBUS_OBJECT_PATH,
-            dbus_interface=self.DBUS_ROOT_INTERFACE,
+            object_path=self.DBUS_OBJECT_PATH,
+            interface=self.DBUS_ROOT_INTERFACE,
             signal_name='NameOwnerChanged',
             arg0=self._bus_name,
-            handler_function=self._on_specific_name_owner_changed,
         )
         self._specific_name_owner_changed_signal_match = signal_match
 
@@ -370,12 +824,12 @@ class MPRISBlocklet:
     def _connect_to_any_name_owner_changed_signal(self):
         if self._any_name_owner_changed_signal_match:
             return
-        signal_match = self._bus.add_signal_receiver(
+        signal_match = self._backend.add_signal_receiver(
+            self._on_any_name_owner_changed,
             bus_name=self.DBUS_BUS_NAME,
-            path=self.DBUS_OBJECT_PATH,
-            dbus_interface=self.DBUS_ROOT_INTERFACE,
+            object_path=self.DBUS_OBJECT_PATH,
+            interface=self.DBUS_ROOT_INTERFACE,
             signal_name='NameOwnerChanged',
-            handler_function=self._on_any_name_owner_changed,
         )
         self._any_name_owner_changed_signal_match = signal_match
 
@@ -402,12 +856,11 @@ class MPRISBlocklet:
             self._any_name_owner_changed_signal_match = None
 
     def get_property(self, property_name):
-        return self._bus.call_blocking(
+        return self._backend.get_property(
             bus_name=self._bus_name,
             object_path=self.MPRIS_OBJECT_PATH,
-            dbus_interface=self.DBUS_PROPERTIES_INTERFACE,
-            method='Get', signature='ss',
-            args=[self.MPRIS_PLAYER_INTERFACE, property_name],
+            interface=self.MPRIS_PLAYER_INTERFACE,
+            property_name=property_name,
         )
 
     def show_initial_info(self):
@@ -429,20 +882,233 @@ class MPRISBlocklet:
             return
         artist = ', '.join(metadata.get('xesam:artist', ()))
         title = metadata.get('xesam:title', '')
-        info = self._formatter.format(
-            self._format_string,
+        template = self._templates.get(status, self._templates['default'])
+        info = self._formatter.render(
+            template,
             status=status,
             artist=artist,
             title=title,
         )
-        if not only_if_changed or self._last_info != info:
-            print(info, flush=True)
-            self._last_info = info
+        dedupe_key = self._get_dedupe_key(info)
+        if not only_if_changed or self._last_info != dedupe_key:
+            self.output(info)
+            self._last_info = dedupe_key
+
+    def _get_dedupe_key(self, info: str):
+        return info
 
     def show_placeholder(self, *, only_if_not_empty: bool = False):
         if only_if_not_empty and not self._placeholder:
             return
-        print(self._placeholder, flush=True)
+        self.output(self._placeholder)
+
+    def output(self, text: str):
+        print(text, flush=True)
+
+
+class Update(NamedTuple):
+    # the same line the CLI blocklet prints
+    text: str
+    # MPRIS `PlaybackStatus`; None if the placeholder is shown
+    status: str | None
+    # the bus name of the current player; None if the placeholder is shown
+    bus_name: str | None
+
+
+# put into the update queue by `AsyncMPRISBlocklet.stop()`
+_STOP = object()
+
+
+class AsyncMPRISBlocklet(MPRISBlocklet):
+    """The blocklet for embedding into asyncio applications.
+
+    It must be used within an event loop provided by
+    `gi.events.GLibEventLoopPolicy`, so D-Bus signals are dispatched by
+    the caller's loop itself, without a dedicated thread or GLib main loop::
+
+        asyncio.set_event_loop_policy(gi.events.GLibEventLoopPolicy())
+
+        async def main():
+            async with AsyncMPRISBlocklet('spotify') as blocklet:
+                async for update in blocklet.updates():
+                    ...
+
+    The stdin is not read; use `click()` or `call()` instead.
+    """
+
+    _initial_info_task = None
+    _stopped = False
+
+    def __init__(self, bus_name, config=None):
+        super().__init__(bus_name, config)
+        self._updates: asyncio.Queue[Update | object] = asyncio.Queue()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.stop()
+
+    async def connect(self, *, nowait=False) -> bool:
+        from gi.events import GLibEventLoop
+
+        if self._stopped:
+            raise RuntimeError(
+                'the blocklet is stopped, create a new one to reconnect')
+        loop = asyncio.get_running_loop()
+        if not isinstance(loop, GLibEventLoop):
+            raise RuntimeError(
+                'GLib event loop is required, '
+                'use gi.events.GLibEventLoopPolicy'
+            )
+        await self._wait_for_reply(self._backend.connect_async)
+        # the same as `start()`, but without blocking calls
+        match_mode = MatchMode.UNKNOWN
+        if await self._name_has_owner(self._bus_name):
+            match_mode = MatchMode.EXACT
+        else:
+            names, = await self._call_dbus_method('ListNames')
+            for name in names:
+                self._maybe_add_instance(name)
+            for bus_name in reversed(tuple(self._instances)):
+                if await self._name_has_owner(bus_name):
+                    match_mode = MatchMode.PREFIX
+                    self._bus_name = bus_name
+                    break
+                del self._instances[bus_name]
+        if not self._subscribe(match_mode, nowait=nowait):
+            return False
+        # the task is replaced if the player restarts meanwhile and
+        # cancelled by `stop()`; `asyncio.wait` does not propagate
+        # the cancellation of the awaited task to the caller
+        while self._initial_info_task and not self._initial_info_task.done():
+            await asyncio.wait({self._initial_info_task})
+        return True
+
+    def stop(self):
+        """Unsubscribes from all signals and ends all `updates()` iterators.
+
+        The blocklet cannot be connected again after that.
+        """
+        super().stop()
+        self._stopped = True
+        if self._initial_info_task:
+            self._initial_info_task.cancel()
+            self._initial_info_task = None
+        self._updates.put_nowait(_STOP)
+
+    async def updates(self) -> AsyncIterator[Update]:
+        while True:
+            update = await self._updates.get()
+            if update is _STOP:
+                # let other iterators stop too
+                self._updates.put_nowait(_STOP)
+                return
+            yield update
+
+    async def click(self, button: str) -> None:
+        """Calls the method mapped to the X11 mouse `button`, if any."""
+        if not self._player_connected:
+            return
+        method_name = self._mouse_buttons.get(button)
+        if method_name:
+            await self.call(method_name)
+
+    async def call(self, method_name: str) -> None:
+        """Calls the MPRIS player method and waits for the reply."""
+        if not self._player_connected:
+            raise RuntimeError('player is not connected')
+        await self._call_method(
+            bus_name=self._bus_name,
+            object_path=self.MPRIS_OBJECT_PATH,
+            interface=self.MPRIS_PLAYER_INTERFACE,
+            method=method_name,
+        )
+
+    async def _call_method(self, **kwargs) -> tuple:
+        return await self._wait_for_reply(self._backend.call_method, **kwargs)
+
+    async def _wait_for_reply(self, func, **kwargs) -> tuple:
+        """Calls a callback-based backend method and waits for the reply."""
+        future = asyncio.get_running_loop().create_future()
+
+        def on_reply(*result):
+            if not future.done():
+                future.set_result(result)
+
+        def on_error(exc):
+            if not future.done():
+                future.set_exception(exc)
+
+        func(reply_handler=on_reply, error_handler=on_error, **kwargs)
+        return await future
+
+    async def _call_dbus_method(
+        self, method: str, signature: str = '', args: tuple = (),
+    ) -> tuple:
+        return await self._call_method(
+            bus_name=self.DBUS_BUS_NAME,
+            object_path=self.DBUS_OBJECT_PATH,
+            interface=self.DBUS_ROOT_INTERFACE,
+            method=method, signature=signature, args=args,
+        )
+
+    async def _name_has_owner(self, bus_name: str) -> bool:
+        has_owner, = await self._call_dbus_method(
+            'NameHasOwner', 's', (bus_name,))
+        return bool(has_owner)
+
+    async def _get_all_properties(self, bus_name: str) -> dict:
+        properties, = await self._call_method(
+            bus_name=bus_name,
+            object_path=self.MPRIS_OBJECT_PATH,
+            interface=self.DBUS_PROPERTIES_INTERFACE,
+            method='GetAll', signature='s',
+            args=(self.MPRIS_PLAYER_INTERFACE,),
+        )
+        return properties
+
+    def _pick_instance(self) -> str | None:
+        # called from the NameOwnerChanged handler when the current instance
+        # has gone; instances are not checked with blocking NameHasOwner calls
+        # since vanished ones are already removed by the handler of
+        # the preceding signals
+        self._instances.pop(self._bus_name, None)
+        for bus_name in reversed(tuple(self._instances)):
+            return bus_name
+        return None
+
+    def show_initial_info(self):
+        if self._initial_info_task:
+            self._initial_info_task.cancel()
+        self._initial_info_task = asyncio.get_running_loop().create_task(
+            self._show_initial_info(self._bus_name))
+
+    async def _show_initial_info(self, bus_name: str):
+        # a single call, so the reply cannot mix values from before and
+        # after a `PropertiesChanged` signal
+        try:
+            properties = await self._get_all_properties(bus_name)
+        except self._backend.errors:
+            # the player has gone, NameOwnerChanged handler takes care of it
+            return
+        if self._player_connected and self._bus_name == bus_name:
+            self.show_info(
+                status=properties.get('PlaybackStatus'),
+                metadata=properties.get('Metadata'),
+            )
+
+    def _get_dedupe_key(self, info: str):
+        # status and player changes are reported even if the text is the same
+        return info, self._last_status, self._bus_name
+
+    def output(self, text: str):
+        if self._player_connected:
+            update = Update(text, self._last_status, self._bus_name)
+        else:
+            update = Update(text, None, None)
+        self._updates.put_nowait(update)
 
 
 def _add_boolean_flag_group(
@@ -466,6 +1132,8 @@ def _parse_args():
     _add_boolean_flag_group(parser, 'markup-escape')
     _add_boolean_flag_group(parser, 'sanitize-unicode')
     _add_boolean_flag_group(parser, 'dedupe')
+    _add_boolean_flag_group(parser, 'conditional-segments')
+    parser.add_argument('--backend', choices=list(MPRISBlocklet.BACKENDS))
     parser.add_argument('--version', action='version', version=__version__)
     args = parser.parse_args()
     return args